@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -15,3 +16,58 @@ def preprocess_market_data(file_path: str):
     
     return df
 
+
+
+OHLC_AGGREGATION = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'volume': 'sum',
+}
+
+RESAMPLE_RULES = {
+    'weekly': 'W-FRI',
+    'monthly': 'ME',
+}
+
+
+def resample_ohlc(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregates daily bars (indexed by date) into weekly or monthly OHLC bars.
+    Each bucket is labelled with the date of its last trading day.
+    """
+    if interval not in RESAMPLE_RULES:
+        return df
+    dates = df.index.to_series().resample(RESAMPLE_RULES[interval]).last()
+    bars = df.resample(RESAMPLE_RULES[interval]).agg(OHLC_AGGREGATION)
+    bars.index = dates.values
+    return bars.dropna(subset=['close'])
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling. Returns the indices of the n_out
+    points that best keep the visual shape of the y series.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean() if next_end > end else x[-1]
+        next_y = y[end:next_end].mean() if next_end > end else y[-1]
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[i + 1] = previous
+    return selected
@@ -2,8 +2,8 @@
 
 import os
 import sys
-from datetime import timedelta, datetime
-from fastapi import FastAPI, Depends, HTTPException
+from datetime import timedelta, datetime, date
+from fastapi import FastAPI, Depends, HTTPException, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
@@ -11,7 +11,11 @@ from sqlalchemy.orm import Session
 import google.generativeai as genai
 import json
 import re
+import secrets
 import requests
+import numpy as np
+import pandas as pd
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # --- 1. Fix Import Paths ---
@@ -20,8 +24,17 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 # --- 2. Import Custom Modules ---
-from backend.database import get_db, create_database, User, FinancialPlan
+from backend.database import get_db, create_database, User, FinancialPlan, GoalProjection, PriceBar
+from backend.analysis import resample_ohlc, lttb_indices, RESAMPLE_RULES
+from backend.rate_limit import AdmissionControlMiddleware, client_identity
+from backend.chat_sessions import ChatSessionStore
+from backend.compression import CompressionMiddleware
+from backend.drafts import get_draft_store
+from backend.cache import cache
+from backend.health import check_financial_health_triggers, calculate_health_score
 from ml.fuzzy_logic import calculate_risk_profile
+from ml.goal_projection import project_goal, parse_goal_amount, REFERENCE_PORTFOLIOS, REFERENCE_PATHS
+from ml.backtest import backtest_portfolios, parse_allocation, REBALANCE_FREQUENCIES
 from backend.auth import (
     create_access_token,
     get_password_hash,
@@ -38,6 +51,7 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 ALPHA_VANTAGE_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
 SECRET_KEY = os.getenv("SECRET_KEY")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # Unlocks operator metrics endpoints; unset disables them
 
 # Safety check: Ensure all keys are present
 if not all([GEMINI_API_KEY, NEWS_API_KEY, ALPHA_VANTAGE_KEY, SECRET_KEY]):
@@ -49,6 +63,13 @@ if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
     model = genai.GenerativeModel('gemini-flash-latest')
 
+# Cache lifetimes (seconds) for upstream calls, shared across workers via backend.cache
+QUOTE_CACHE_TTL = 60
+NEWS_CACHE_TTL = 300
+LLM_CACHE_TTL = 3600
+INTENT_CACHE_TTL = 86400
+RISK_CACHE_TTL = 86400
+
 # AI Persona Instructions
 SYSTEM_INSTRUCTION = """
 You are 'IntellectMoney AI', a sophisticated financial analyst for Indian investors.
@@ -69,10 +90,22 @@ Example Response Style:
 * **Liquidity:** Open-ended funds offer high liquidity."
 """
 
+# Chat model with the persona set once as a system instruction, instead of
+# prepending SYSTEM_INSTRUCTION to every question
+if GEMINI_API_KEY:
+    chat_model = genai.GenerativeModel('gemini-flash-latest', system_instruction=SYSTEM_INSTRUCTION)
+
 # --- 4. App Setup ---
 create_database() # Create tables if they don't exist
 app = FastAPI(title="IntellectMoney API")
 
+# Response Compression (brotli/gzip for JSON bodies over the size threshold)
+app.add_middleware(CompressionMiddleware)
+
+# Admission Control (per-user rate limits + global concurrency cap)
+# Added before CORS so that 429/503 responses still carry CORS headers.
+app.add_middleware(AdmissionControlMiddleware)
+
 # CORS Middleware (Crucial for Frontend-Backend communication)
 app.add_middleware(
     CORSMiddleware,
@@ -82,6 +115,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Generated plans waiting to be saved (see /api/plans)
+plan_drafts = get_draft_store()
+
+# Chatbot conversations, one per server-issued session id (see /api/chatbot)
+chat_sessions = ChatSessionStore()
+
 # Serve Frontend Files
 app.mount("/static", StaticFiles(directory="frontend"), name="static")
 
@@ -109,6 +148,7 @@ class UserFinancialProfile(BaseModel):
     expenses: float
     savings: float
     financial_goal: Optional[str] = "General Wealth Building"
+    goal_amount: Optional[float] = None
     risk_tolerance_input: str
 
 class Alert(BaseModel):
@@ -121,12 +161,19 @@ class RecommendationResponse(BaseModel):
     recommendations: List[str]
     portfolio: dict
     alerts: List[Alert] = []
+    goal_projection: Optional[dict] = None
+    draft_id: Optional[str] = None
+
+class SavePlanRequest(BaseModel):
+    draft_id: str
 
 class ChatMessage(BaseModel):
     message: str
+    session_id: Optional[str] = None
 
 class ChatResponse(BaseModel):
     reply: str
+    session_id: Optional[str] = None
 
 class NewsArticle(BaseModel):
     title: str
@@ -142,12 +189,37 @@ class PlanResponse(BaseModel):
     created_at: datetime
     income: float
     expenses: float
-    ai_summary: str
-    recommendations_json: str
-    portfolio_json: str
+    ai_summary: Optional[str]
+    recommendations_json: Optional[str]
+    portfolio_json: Optional[str]
     class Config:
         from_attributes = True
 
+class BacktestResponse(BaseModel):
+    start_date: Optional[str]
+    end_date: Optional[str]
+    rebalance: str
+    total_return: Optional[float]
+    cagr: Optional[float]
+    volatility: Optional[float]
+    max_drawdown: Optional[float]
+    proxied_asset_classes: List[str]
+    curve: dict
+
+class PriceBarOut(BaseModel):
+    date: date
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: Optional[float] = None
+
+class PriceHistoryResponse(BaseModel):
+    symbol: str
+    interval: str
+    total_bars: int
+    bars: List[PriceBarOut]
+
 class HealthScoreResponse(BaseModel):
     score: int
     rating: str
@@ -156,14 +228,53 @@ class HealthScoreResponse(BaseModel):
 
 # --- 6. Helper Functions ---
 
+def generate_text(prompt: str, ttl: int = LLM_CACHE_TTL, should_cache=None) -> str:
+    """
+    Gemini completion for a prompt, cached so identical prompts hit the API once.
+    Pass should_cache to keep replies the caller cannot use out of the cache, so a retry asks again.
+    """
+    return cache.get_or_set("gemini", prompt, lambda: model.generate_content(prompt).text, ttl, should_cache)
+
+
+def parse_plan_reply(raw_text: str):
+    """Splits a plan reply into (advice text, portfolio dict). Raises ValueError if it is malformed."""
+    advice_start_index = raw_text.find('<advice>')
+    portfolio_start_index = raw_text.find('<portfolio>')
+
+    if advice_start_index == -1 or portfolio_start_index == -1:
+        raise ValueError("AI response format error: missing tags.")
+
+    advice_text = raw_text[advice_start_index + len('<advice>'):portfolio_start_index].strip()
+    portfolio_block = raw_text[portfolio_start_index + len('<portfolio>'):].strip()
+
+    json_match = re.search(r'\{.*\}', portfolio_block, re.DOTALL)
+    if not json_match:
+        raise ValueError("Could not find JSON in portfolio block.")
+
+    portfolio = json.loads(json_match.group(0))
+    if not isinstance(portfolio, dict):
+        raise ValueError("Portfolio block is not a JSON object.")
+    return advice_text, portfolio
+
+
+def is_valid_plan_reply(raw_text) -> bool:
+    try:
+        parse_plan_reply(raw_text)
+        return True
+    except (TypeError, ValueError):
+        return False
+
 def fetch_stock_price(symbol: str):
     """Fetches live stock price from Alpha Vantage."""
     api_symbol = symbol.split('.')[0] # Remove .NSE/.BSE suffix
     url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={api_symbol}&apikey={ALPHA_VANTAGE_KEY}"
     
     try:
-        response = requests.get(url)
-        data = response.json()
+        # Only complete quotes are cached; rate-limit notes and errors are retried next time
+        data = cache.get_or_set(
+            "alpha_vantage_quotes", api_symbol, lambda: requests.get(url).json(), QUOTE_CACHE_TTL,
+            should_cache=lambda d: bool(d.get("Global Quote", {}).get("05. price"))
+        )
         
         # Check for API errors or limits
         if "Note" in data:
@@ -183,54 +294,45 @@ def fetch_stock_price(symbol: str):
         print(f"Alpha Vantage API error: {e}")
         return "Sorry, I'm having trouble connecting to the stock market data service."
 
-def check_financial_health_triggers(income: float, expenses: float, total_savings: float):
-    """
-    Acts as an autonomous agent that monitors financial health.
-    """
-    alerts = []
-    
-    # Calculate Monthly Savings (Cash Flow)
-    monthly_savings = income - expenses
-    savings_rate = (monthly_savings / income) * 100 if income > 0 else 0
-
-    # Calculate Emergency Fund Coverage (Months of expenses covered)
-    emergency_months = total_savings / expenses if expenses > 0 else 0
-    
-    # --- RULE 1: HIGH SPENDING (Habit Alert) ---
-    if income > 0 and expenses > (income * 0.8):
-        alerts.append({
-            "type": "danger",
-            "icon": "⚠️",
-            "message": f"Critical: You are spending {int((expenses/income)*100)}% of your income. Immediate budgeting required."
-        })
-    
-    # --- RULE 2: DEFICIT (Habit Alert) ---
-    if expenses > income:
-        alerts.append({
-            "type": "danger",
-            "icon": "🚨",
-            "message": "Deficit Alert: You are spending more than you earn. You are burning through cash."
-        })
+def describe_projection(projection: dict) -> str:
+    """Turns a Monte Carlo goal projection into plain text for the AI prompt."""
+    lines = [
+        f"- Expected annual return {projection['expected_annual_return']}%, volatility {projection['annual_volatility']}% "
+        f"({projection['simulated_paths']:,} simulated market paths)."
+    ]
+    contribution = projection.get("monthly_contribution", 0)
+    if contribution < 0:
+        lines.append(
+            f"- Expenses exceed income, so ₹{-contribution:,.0f} is withdrawn from savings every month; "
+            f"paths that run out of money stay at ₹0."
+        )
+    months = projection.get("months_to_goal")
+    if months and contribution <= 0 and months["p50"] is None:
+        lines.append(
+            f"- ₹{projection['goal_amount']:,.0f} is not reachable at the current monthly surplus in most "
+            f"simulated paths. Do not promise a timeline; focus on closing the gap between income and expenses."
+        )
+    elif months:
+        def fmt(m):
+            return "not within 30 years" if m is None else f"{m // 12} years {m % 12} months"
+        lines.append(
+            f"- Time to reach ₹{projection['goal_amount']:,.0f}: optimistic {fmt(months['p10'])}, "
+            f"typical {fmt(months['p50'])}, pessimistic {fmt(months['p90'])} "
+            f"(probability within 30 years: {projection['probability_of_reaching_goal'] * 100:.0f}%)."
+        )
+    for year, band in projection["wealth_bands"].items():
+        if year in ("year_1", "year_5", "year_10"):
+            lines.append(
+                f"- Wealth after {year.split('_')[1]} year(s): ₹{band['p10']:,.0f} (pessimistic) to "
+                f"₹{band['p90']:,.0f} (optimistic), typical ₹{band['p50']:,.0f}."
+            )
+    return "\n".join(lines)
 
-    # --- RULE 3: LOW EMERGENCY FUND (Safety Alert) ---
-    # If you have less than 3 months of expenses saved up
-    if emergency_months < 3:
-        alerts.append({
-            "type": "warning",
-            "icon": "📉",
-            "message": f"Risk Detected: Your emergency fund only covers {emergency_months:.1f} months of expenses. Aim for 6 months."
-        })
 
-    # --- RULE 4: EXCELLENT HABITS (Habit Alert) ---
-    # Real Monthly Savings Rate > 30%
-    if savings_rate > 30:
-        alerts.append({
-            "type": "success",
-            "icon": "🌟",
-            "message": f"Excellent: You are saving {int(savings_rate)}% of your monthly income. You are on track for wealth building."
-        })
-
-    return alerts
+@lru_cache(maxsize=1024)
+def cached_plan_backtest(plan_id: int, portfolio_json: str, rebalance: str):
+    """Backtest results per plan. Saved portfolios never change, so entries never go stale."""
+    return backtest_portfolios([json.loads(portfolio_json)], rebalance, include_curve=True)[0]
 
 
 # --- 7. API Endpoints ---
@@ -278,8 +380,11 @@ def login_user(user: UserLogin, db: Session = Depends(get_db)):
 
 # --- Intelligent Chatbot ---
 @app.post("/api/chatbot", response_model=ChatResponse)
-def handle_chat(message: ChatMessage):
+def handle_chat(message: ChatMessage, request: Request):
     user_message = message.message.strip()
+    # The server issues session ids and binds each to the caller (JWT user, else IP). An
+    # unknown, expired or someone else's id starts a new conversation under a fresh id.
+    session_id = chat_sessions.open(message.session_id, client_identity(request))
 
     # 1. Intent Detection
     intent_prompt = f"""
@@ -291,8 +396,7 @@ def handle_chat(message: ChatMessage):
     """
     
     try:
-        intent_response = model.generate_content(intent_prompt)
-        classification = intent_response.text.strip()
+        classification = generate_text(intent_prompt, ttl=INTENT_CACHE_TTL).strip()
         
         print(f"--- Chatbot Intent: {classification} ---")
 
@@ -300,17 +404,28 @@ def handle_chat(message: ChatMessage):
         if "." in classification and "GENERAL" not in classification:
             stock_symbol = classification
             price_info = fetch_stock_price(stock_symbol)
-            return {"reply": price_info}
+            chat_sessions.record(session_id, user_message, price_info)
+            return {"reply": price_info, "session_id": session_id}
 
-        # 3. General Conversation Logic
+        # 3. General Conversation Logic (with this user's conversation history)
         else:
-            general_prompt = f"{SYSTEM_INSTRUCTION}\n\nUSER QUESTION: {user_message}"
-            general_response = model.generate_content(general_prompt)
-            return {"reply": general_response.text}
+            reply = chat_sessions.reply(session_id, user_message, chat_model, model)
+            return {"reply": reply, "session_id": session_id}
 
     except Exception as e:
         print(f"Chatbot Error: {e}")
-        return {"reply": "I'm sorry, I'm having trouble connecting to my AI brain right now. Please try again."}
+        return {
+            "reply": "I'm sorry, I'm having trouble connecting to my AI brain right now. Please try again.",
+            "session_id": session_id,
+        }
+
+
+@app.get("/api/chatbot/metrics")
+def get_chat_metrics(x_metrics_token: Optional[str] = Header(None)):
+    # Operators only: the X-Metrics-Token header must match METRICS_TOKEN
+    if not METRICS_TOKEN or not secrets.compare_digest(x_metrics_token or "", METRICS_TOKEN):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return chat_sessions.metrics()
 
 
 # --- Market News ---
@@ -322,8 +437,10 @@ def get_market_news():
         f"&apiKey={NEWS_API_KEY}"
     )
     try:
-        response = requests.get(url)
-        data = response.json()
+        data = cache.get_or_set(
+            "newsapi", "finance", lambda: requests.get(url).json(), NEWS_CACHE_TTL,
+            should_cache=lambda d: d.get("status") == "ok"
+        )
         
         if data.get("status") != "ok":
             raise HTTPException(status_code=500, detail="Failed to fetch news.")
@@ -344,6 +461,53 @@ def get_market_news():
         raise HTTPException(status_code=500, detail="Failed to fetch market news.")
 
 
+# --- Price History (for dashboard charts) ---
+@app.get("/api/prices/{symbol}", response_model=PriceHistoryResponse)
+def get_price_history(
+    symbol: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    interval: str = "daily",
+    max_points: int = 500,
+    db: Session = Depends(get_db)
+):
+    if interval not in ("daily", *RESAMPLE_RULES):
+        raise HTTPException(status_code=400, detail="interval must be one of: daily, weekly, monthly")
+    if max_points < 3:
+        raise HTTPException(status_code=400, detail="max_points must be at least 3")
+
+    query = db.query(
+        PriceBar.date, PriceBar.open, PriceBar.high, PriceBar.low, PriceBar.close, PriceBar.volume
+    ).filter(PriceBar.symbol == symbol.upper())
+    if start:
+        query = query.filter(PriceBar.date >= start)
+    if end:
+        query = query.filter(PriceBar.date <= end)
+
+    df = pd.read_sql(query.order_by(PriceBar.date).statement, db.connection(), parse_dates=["date"])
+    if df.empty:
+        raise HTTPException(status_code=404, detail=f"No price data for {symbol.upper()} in this range.")
+    total_bars = len(df)
+
+    # 1. OHLC aggregation into weekly/monthly buckets
+    df = resample_ohlc(df.set_index("date"), interval)
+
+    # 2. Shape-preserving reduction to the point budget
+    if len(df) > max_points:
+        x = df.index.values.astype("datetime64[D]").astype(np.int64).astype(float)
+        df = df.iloc[lttb_indices(x, df["close"].to_numpy(dtype=float), max_points)]
+
+    bars = df.reset_index().rename(columns={"index": "date"})
+    bars["date"] = bars["date"].dt.date
+    bars["volume"] = bars["volume"].astype(object).where(bars["volume"].notna(), None)
+    return {
+        "symbol": symbol.upper(),
+        "interval": interval,
+        "total_bars": total_bars,
+        "bars": bars.to_dict("records"),
+    }
+
+
 # --- Core Feature: AI Financial Plan Generator ---
 @app.post("/api/recommendations", response_model=RecommendationResponse)
 
@@ -356,10 +520,15 @@ def get_recommendations(profile: UserFinancialProfile):
     user_input_clean = profile.risk_tolerance_input.lower().strip()
     user_risk_preference = risk_mapping.get(user_input_clean, 5)
     
-    calculated_risk_score = calculate_risk_profile(
-        income=profile.income, 
-        savings=profile.savings, 
-        user_preference=user_risk_preference
+    calculated_risk_score = cache.get_or_set(
+        "risk_profile",
+        (profile.income, profile.savings, user_risk_preference),
+        lambda: float(calculate_risk_profile(
+            income=profile.income, 
+            savings=profile.savings, 
+            user_preference=user_risk_preference
+        )),
+        RISK_CACHE_TTL
     )
     
     print(f"DEBUG: Input={user_input_clean}, Score={calculated_risk_score:.2f}")
@@ -383,6 +552,15 @@ def get_recommendations(profile: UserFinancialProfile):
     if not agent_context_str:
         agent_context_str = "- No critical risks detected. Standard planning applies."
 
+    # Monte Carlo projection on a reference allocation for this investor type.
+    # The AI uses these figures instead of guessing a timeline itself.
+    goal_amount = profile.goal_amount or parse_goal_amount(profile.financial_goal)
+    reference_projection = project_goal(
+        profile.savings, monthly_surplus, REFERENCE_PORTFOLIOS[risk_profile_description], goal_amount,
+        n_paths=REFERENCE_PATHS
+    )
+    projection_context_str = describe_projection(reference_projection)
+
     # 3. Generative AI Prompt with FINANCIAL GOAL
     prompt = f"""
     You are an expert financial advisor for an Indian user.
@@ -401,7 +579,10 @@ def get_recommendations(profile: UserFinancialProfile):
     
     >>> INSTRUCTION FOR GOAL:
     - SPECIFICALLY address how the user can achieve their goal ("{profile.financial_goal}") based on their monthly surplus of ₹{monthly_surplus:,.2f}.
-    - Estimate the time in months/years it will take to save this amount.
+    - Use ONLY the simulated projection below when stating how long the goal will take. Do not make up your own estimate.
+
+    >>> SIMULATED GOAL PROJECTION:
+    {projection_context_str}
 
     >>> USER PROFILE:
     <income>₹{profile.income:,.2f}</income>
@@ -419,26 +600,12 @@ def get_recommendations(profile: UserFinancialProfile):
     """
 
     try:
-        response = model.generate_content(prompt)
-        raw_text = response.text
+        # Malformed replies are not cached, so retrying the same profile asks Gemini again
+        raw_text = generate_text(prompt, should_cache=is_valid_plan_reply)
         print("--- AI Raw Response --- \n", raw_text, "\n-----------------------")
         
         # 4. Robust Parsing Logic
-        advice_start_index = raw_text.find('<advice>')
-        portfolio_start_index = raw_text.find('<portfolio>')
-
-        if advice_start_index == -1 or portfolio_start_index == -1:
-            raise ValueError("AI response format error: missing tags.")
-
-        advice_text = raw_text[advice_start_index + len('<advice>'):portfolio_start_index].strip()
-        portfolio_block = raw_text[portfolio_start_index + len('<portfolio>'):].strip()
-
-        json_match = re.search(r'\{.*\}', portfolio_block, re.DOTALL)
-        if not json_match:
-            raise ValueError("Could not find JSON in portfolio block.")
-        
-        portfolio_json_str = json_match.group(0)
-        portfolio = json.loads(portfolio_json_str)
+        advice_text, portfolio = parse_plan_reply(raw_text)
 
         recommendations = [
             rec.strip() 
@@ -458,11 +625,38 @@ def get_recommendations(profile: UserFinancialProfile):
             "ai_summary": summary_paragraph
         }
         
+        # Re-project on the allocation the AI actually recommended
+        goal_projection = project_goal(profile.savings, monthly_surplus, portfolio, goal_amount)
+
+        # Keep the plan server-side, ready to persist, so saving only needs the draft id
+        months = goal_projection.get("months_to_goal") or {}
+        draft_id = plan_drafts.put({
+            "plan": {
+                "income": profile.income,
+                "expenses": profile.expenses,
+                "savings": profile.savings,
+                "risk_tolerance": profile.risk_tolerance_input,
+                "ai_summary": summary_paragraph,
+                "recommendations_json": json.dumps(recommendations),
+                "portfolio_json": json.dumps(portfolio),
+            },
+            "projection": {
+                "goal_amount": goal_projection["goal_amount"],
+                "months_p10": months.get("p10"),
+                "months_p50": months.get("p50"),
+                "months_p90": months.get("p90"),
+                "probability": goal_projection["probability_of_reaching_goal"],
+                "projection_json": json.dumps(goal_projection),
+            },
+        })
+
         return {
             "summary": summary, 
             "recommendations": recommendations, 
             "portfolio": portfolio,
-            "alerts": agent_alerts 
+            "alerts": agent_alerts,
+            "goal_projection": goal_projection,
+            "draft_id": draft_id
         }
 
     except Exception as e:
@@ -472,21 +666,17 @@ def get_recommendations(profile: UserFinancialProfile):
 # --- Saving Plans ---
 @app.post("/api/plans")
 def save_financial_plan(
-    plan_data: RecommendationResponse,
-    profile_data: UserFinancialProfile,
+    request: SavePlanRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    new_plan = FinancialPlan(
-        income=profile_data.income,
-        expenses=profile_data.expenses,
-        savings=profile_data.savings,
-        risk_tolerance=profile_data.risk_tolerance_input,
-        ai_summary=plan_data.summary.get("ai_summary"),
-        recommendations_json=json.dumps(plan_data.recommendations),
-        portfolio_json=json.dumps(plan_data.portfolio),
-        owner_id=current_user.id
-    )
+    draft = plan_drafts.take(request.draft_id)
+    if draft is None:
+        raise HTTPException(status_code=404, detail="Plan draft not found or expired. Please generate your plan again.")
+
+    new_plan = FinancialPlan(**draft["plan"], owner_id=current_user.id)
+    if draft.get("projection"):
+        new_plan.goal_projection = GoalProjection(**draft["projection"])
     db.add(new_plan)
     db.commit()
     db.refresh(new_plan)
@@ -498,35 +688,49 @@ def get_user_plans(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return db.query(FinancialPlan).filter(FinancialPlan.owner_id == current_user.id).order_by(FinancialPlan.created_at.desc()).all()
+    # Only the response columns, as plain rows: no ORM objects to build. FastAPI validates
+    # them against PlanResponse and serializes straight to JSON bytes in pydantic-core.
+    # Validation is kept on purpose: it is ~1 ms for 1000 plans and guards the API contract.
+    rows = db.query(
+        FinancialPlan.id,
+        FinancialPlan.created_at,
+        FinancialPlan.income,
+        FinancialPlan.expenses,
+        FinancialPlan.ai_summary,
+        FinancialPlan.recommendations_json,
+        FinancialPlan.portfolio_json,
+    ).filter(FinancialPlan.owner_id == current_user.id).order_by(FinancialPlan.created_at.desc()).all()
+    return [row._asdict() for row in rows]
+
+# --- Backtesting a Saved Plan ---
+@app.get("/api/plans/{plan_id}/backtest", response_model=BacktestResponse)
+def backtest_plan(
+    plan_id: int,
+    rebalance: str = "monthly",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if rebalance not in REBALANCE_FREQUENCIES:
+        raise HTTPException(status_code=400, detail=f"rebalance must be one of: {', '.join(REBALANCE_FREQUENCIES)}")
+
+    plan = db.query(FinancialPlan).filter(
+        FinancialPlan.id == plan_id, FinancialPlan.owner_id == current_user.id
+    ).first()
+    if not plan:
+        raise HTTPException(status_code=404, detail="Plan not found")
+
+    try:
+        parse_allocation(plan.portfolio_json or "{}")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"This plan has no usable portfolio allocation: {e}")
+
+    try:
+        return cached_plan_backtest(plan.id, plan.portfolio_json, rebalance)
+    except Exception as e:
+        print(f"Backtest Error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to backtest this plan.")
 
 # --- Health Score ---
 @app.post("/api/health-score", response_model=HealthScoreResponse)
 def get_health_score(profile: UserFinancialProfile):
-    # 1. Calculate Metrics
-    savings_rate = 0
-    if profile.income > 0:
-        savings_rate = ((profile.income - profile.expenses) / profile.income) * 100
-    
-    savings_buffer = 0
-    if profile.expenses > 0:
-        savings_buffer = profile.savings / profile.expenses
-        
-    # 2. Scoring Logic
-    score = 0
-    score += max(0, min(60, savings_rate * 1.2)) # Max 60 pts from rate
-    score += max(0, min(40, (savings_buffer / 6) * 40)) # Max 40 pts from buffer
-    
-    score = int(score)
-    
-    # 3. Rating
-    rating = "Needs Improvement"
-    feedback = "Focus on increasing your monthly savings."
-    if score > 80:
-        rating = "Excellent"
-        feedback = "You have outstanding financial discipline!"
-    elif score > 60:
-        rating = "Good"
-        feedback = "You are on the right track. Keep it up!"
-        
-    return {"score": score, "rating": rating, "feedback": feedback}
\ No newline at end of file
+    return calculate_health_score(profile.income, profile.expenses, profile.savings)
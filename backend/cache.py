@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite")  # memory | sqlite | redis
+# Next to the app rather than in a shared temp dir, where other local users could plant the file
+CACHE_URL = os.getenv(
+    "CACHE_URL", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "intellectmoney-cache.db")
+)
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "2048"))
+LOCAL_CACHE_MAX_TTL = int(os.getenv("LOCAL_CACHE_MAX_TTL", "30"))
+
+_MISSING = object()
+
+
+def make_key(namespace: str, key) -> str:
+    """Namespaced cache key. Long or non-string keys are hashed to keep keys short."""
+    key = key if isinstance(key, str) else repr(key)
+    if len(key) > 200:
+        key = hashlib.sha256(key.encode()).hexdigest()
+    return f"{namespace}:{key}"
+
+
+# Shared values are stored as JSON, never pickle, so a tampered cache cannot run code
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _loads(raw, default):
+    try:
+        return json.loads(raw)
+    except ValueError:  # e.g. an entry written by an older, pickle-based version
+        return default
+
+
+class LRUCache:
+    """In-process cache with per-entry TTLs. Least recently used entries go first when full."""
+
+    def __init__(self, max_entries: int = LOCAL_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value, ttl: float) -> bool:
+        """Sets the key only if it is absent. Returns True if this call set it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self._entries[key] = (time.monotonic() + ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLiteCache:
+    """Cache in a SQLite file in WAL mode, shared by every worker process on the host."""
+
+    def __init__(self, path: str = CACHE_URL):
+        self.path = path
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._last_purge = 0.0
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, default=None):
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return _loads(row[0], default) if row else default
+
+    def set(self, key: str, value, ttl: float):
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, _dumps(value), now + ttl),
+        )
+        if now - self._last_purge > 60:
+            self._last_purge = now
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+
+    def add(self, key: str, value, ttl: float) -> bool:
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM cache WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, _dumps(value), now + ttl),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def delete(self, key: str):
+        self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+
+class RedisCache:
+    """Cache on any Redis-protocol server (Redis, Valkey, KeyDB, ...), e.g. CACHE_URL=redis://localhost:6379/0."""
+
+    def __init__(self, url: str = CACHE_URL):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis).")
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str, default=None):
+        value = self.client.get(key)
+        return _loads(value, default) if value is not None else default
+
+    def set(self, key: str, value, ttl: float):
+        self.client.set(key, _dumps(value), px=max(1, int(ttl * 1000)))
+
+    def add(self, key: str, value, ttl: float) -> bool:
+        return bool(self.client.set(key, _dumps(value), px=max(1, int(ttl * 1000)), nx=True))
+
+    def delete(self, key: str):
+        self.client.delete(key)
+
+
+class TieredCache:
+    """
+    A small in-process LRU in front of an optional shared backend.
+    Local copies live at most LOCAL_CACHE_MAX_TTL seconds, so workers see shared updates quickly.
+    """
+
+    def __init__(self, shared=None, local: LRUCache = None, local_max_ttl: float = LOCAL_CACHE_MAX_TTL):
+        self.local = local or LRUCache()
+        self.shared = shared
+        self.local_max_ttl = local_max_ttl
+        self._stats = Counter()
+
+    def _lookup(self, full_key: str):
+        """Returns (value, tier) with tier None on a miss."""
+        value = self.local.get(full_key, _MISSING)
+        if value is not _MISSING:
+            return value, "local_hits"
+        if self.shared is not None:
+            value = self.shared.get(full_key, _MISSING)
+            if value is not _MISSING:
+                self.local.set(full_key, value, self.local_max_ttl)
+                return value, "shared_hits"
+        return _MISSING, None
+
+    def get(self, namespace: str, key, default=None):
+        value, tier = self._lookup(make_key(namespace, key))
+        self._stats[(namespace, tier or "misses")] += 1
+        return default if tier is None else value
+
+    def set(self, namespace: str, key, value, ttl: float):
+        full_key = make_key(namespace, key)
+        self.local.set(full_key, value, min(ttl, self.local_max_ttl) if self.shared is not None else ttl)
+        if self.shared is not None:
+            self.shared.set(full_key, value, ttl)
+
+    def delete(self, namespace: str, key):
+        full_key = make_key(namespace, key)
+        self.local.delete(full_key)
+        if self.shared is not None:
+            self.shared.delete(full_key)
+
+    def get_or_set(self, namespace: str, key, compute, ttl: float, should_cache=None, lock_timeout: float = 30.0):
+        """
+        Returns the cached value or computes and stores it. While one process computes,
+        others on the same shared backend wait for its result instead of calling upstream too.
+        Results are stored only if should_cache(value) is true (default: value is not None),
+        and must be JSON-serializable when a shared backend is configured.
+        """
+        value = self.get(namespace, key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        store = self.shared if self.shared is not None else self.local
+        full_key = make_key(namespace, key)
+        lock_key = full_key + ":lock"
+        deadline = time.monotonic() + lock_timeout
+        acquired = store.add(lock_key, 1, lock_timeout)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(0.05)
+            value, tier = self._lookup(full_key)
+            if tier is not None:
+                return value
+            acquired = store.add(lock_key, 1, lock_timeout)
+        # After a timeout we compute anyway, but the lock still belongs to whoever holds it
+        try:
+            value = compute()
+            if should_cache(value) if should_cache else value is not None:
+                self.set(namespace, key, value, ttl)
+            return value
+        finally:
+            if acquired:
+                store.delete(lock_key)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process, per namespace."""
+        result = {}
+        for (namespace, counter), count in self._stats.items():
+            result.setdefault(namespace, {"local_hits": 0, "shared_hits": 0, "misses": 0})[counter] = count
+        for counters in result.values():
+            lookups = sum(counters.values())
+            counters["hit_rate"] = round((counters["local_hits"] + counters["shared_hits"]) / lookups, 4) if lookups else 0.0
+        return result
+
+
+def create_cache(backend: str = CACHE_BACKEND, url: str = CACHE_URL) -> TieredCache:
+    """Builds the cache tiers from CACHE_BACKEND/CACHE_URL."""
+    if backend == "memory":
+        return TieredCache()
+    if backend == "sqlite":
+        return TieredCache(SQLiteCache(url))
+    if backend == "redis":
+        return TieredCache(RedisCache(url))
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+
+cache = create_cache()
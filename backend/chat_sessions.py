@@ -0,0 +1,169 @@
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+
+MAX_CHAT_SESSIONS = int(os.getenv("MAX_CHAT_SESSIONS", "5000"))
+CHAT_SESSION_IDLE_SECONDS = int(os.getenv("CHAT_SESSION_IDLE_SECONDS", "1800"))
+
+RECENT_MESSAGES = 6             # Messages kept verbatim after compaction; older ones go into the summary
+MAX_SESSION_CHARS = 6000        # Compact once verbatim history grows past this
+MAX_MESSAGE_CHARS = 2000        # Longer messages are truncated before they are stored
+MAX_SUMMARY_CHARS = 1500
+
+SUMMARY_PROMPT = """
+Update the running summary of a conversation between an Indian investor and a financial assistant.
+Keep facts the user shared about themselves (income, goals, holdings, preferences) and the key advice given.
+Write at most {max_chars} characters of plain text. Respond with ONLY the updated summary.
+
+CURRENT SUMMARY:
+{summary}
+
+NEW MESSAGES:
+{messages}
+"""
+
+
+class ChatSession:
+    """One conversation: a running summary plus the most recent messages."""
+
+    def __init__(self, owner: str = None):
+        self.owner = owner
+        self.summary = ""
+        self.messages = []          # [{"role": "user" | "model", "parts": [text]}]
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.turns = 0
+        self.compactions = 0
+        self.prompt_tokens = 0
+        self.reply_tokens = 0
+        self.last_prompt_tokens = 0
+
+    def add(self, role: str, text: str):
+        self.messages.append({"role": role, "parts": [text[:MAX_MESSAGE_CHARS]]})
+
+    def history_chars(self) -> int:
+        return len(self.summary) + sum(len(m["parts"][0]) for m in self.messages)
+
+    def contents(self, user_message: str) -> list:
+        """The request contents: summary (if any), recent messages, then the new question."""
+        contents = []
+        if self.summary:
+            contents.append({"role": "user", "parts": [f"Summary of our conversation so far: {self.summary}"]})
+            contents.append({"role": "model", "parts": ["Noted."]})
+        contents.extend(self.messages)
+        contents.append({"role": "user", "parts": [user_message[:MAX_MESSAGE_CHARS]]})
+        return contents
+
+    def compact(self, summary_model):
+        """Folds all but the most recent messages into the running summary."""
+        # Compacting in batches keeps summary calls to one every few turns
+        if len(self.messages) < 2 * RECENT_MESSAGES and self.history_chars() <= MAX_SESSION_CHARS:
+            return
+        keep = RECENT_MESSAGES if len(self.messages) > RECENT_MESSAGES else 2
+        older, self.messages = self.messages[:-keep], self.messages[-keep:]
+        if not older:
+            return
+        transcript = "\n".join(f"{m['role'].upper()}: {m['parts'][0]}" for m in older)
+        try:
+            response = summary_model.generate_content(SUMMARY_PROMPT.format(
+                max_chars=MAX_SUMMARY_CHARS, summary=self.summary or "(none)", messages=transcript
+            ))
+            self.summary = response.text.strip()[:MAX_SUMMARY_CHARS]
+        except Exception as e:
+            # Dropping the oldest turns is better than letting the session grow without bound
+            print(f"Chat summary error: {e}")
+        self.compactions += 1
+
+    def record_usage(self, response):
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return
+        self.last_prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        self.prompt_tokens += self.last_prompt_tokens
+        self.reply_tokens += getattr(usage, "candidates_token_count", 0) or 0
+
+
+class ChatSessionStore:
+    """
+    Chat sessions in memory, keyed by a server-issued session id and bound to the
+    client that opened them. Idle sessions expire and the least recently used are
+    evicted once MAX_CHAT_SESSIONS is reached.
+    """
+
+    def __init__(self, max_sessions: int = MAX_CHAT_SESSIONS, idle_seconds: int = CHAT_SESSION_IDLE_SECONDS):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def open(self, session_id: str, owner: str) -> str:
+        """
+        Returns session_id if it is a live session owned by `owner`, otherwise the id of a new
+        session for `owner`. Ids are only ever issued here, so clients cannot pick or guess one.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id) if session_id else None
+            live = session is not None and time.monotonic() - session.last_used <= self.idle_seconds
+            if live and session.owner == owner:
+                return session_id
+            session_id = secrets.token_urlsafe(16)
+            self._sessions[session_id] = ChatSession(owner)
+        return session_id
+
+    def get(self, key: str) -> ChatSession:
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.pop(key, None)
+            if session is None or now - session.last_used > self.idle_seconds:
+                session = ChatSession(session.owner if session else None)
+            session.last_used = now
+            self._sessions[key] = session
+            # Least recently used sessions sit at the front
+            while self._sessions:
+                oldest_key, oldest = next(iter(self._sessions.items()))
+                if len(self._sessions) <= self.max_sessions and now - oldest.last_used <= self.idle_seconds:
+                    break
+                del self._sessions[oldest_key]
+                self.evictions += 1
+        return session
+
+    def reply(self, key: str, user_message: str, chat_model, summary_model) -> str:
+        """Answers a message in the context of the user's session and records it in the history."""
+        session = self.get(key)
+        with session.lock:
+            session.compact(summary_model)
+            response = chat_model.generate_content(session.contents(user_message))
+            reply = response.text
+            session.add("user", user_message)
+            session.add("model", reply)
+            session.turns += 1
+            session.record_usage(response)
+        return reply
+
+    def record(self, key: str, user_message: str, reply: str):
+        """Adds an exchange answered outside the model (e.g. a stock quote) to the history."""
+        session = self.get(key)
+        with session.lock:
+            session.add("user", user_message)
+            session.add("model", reply)
+            session.turns += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        turns = sum(s.turns for s in sessions)
+        return {
+            "active_sessions": len(sessions),
+            "evicted_sessions": self.evictions,
+            "turns": turns,
+            "compactions": sum(s.compactions for s in sessions),
+            "history_chars": sum(s.history_chars() for s in sessions),
+            "max_session_chars": max((s.history_chars() for s in sessions), default=0),
+            "prompt_tokens": sum(s.prompt_tokens for s in sessions),
+            "reply_tokens": sum(s.reply_tokens for s in sessions),
+            "avg_prompt_tokens_per_turn": round(sum(s.prompt_tokens for s in sessions) / turns, 1) if turns else 0.0,
+        }
@@ -1,4 +1,5 @@
 
+import io
 import os
 from datetime import datetime
 from dotenv import load_dotenv
@@ -11,6 +12,10 @@ from sqlalchemy import (
     ForeignKey,
     Text,
     DateTime,
+    Boolean,
+    Date,
+    BigInteger,
+    insert,
 )
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.ext.declarative import declarative_base
@@ -69,6 +74,72 @@ class FinancialPlan(Base):
     owner_id = Column(Integer, ForeignKey("users.id"))
     owner = relationship("User", back_populates="financial_plans")
 
+    goal_projection = relationship("GoalProjection", back_populates="plan", uselist=False)
+
+
+class GoalProjection(Base):
+    __tablename__ = "goal_projections"
+    plan_id = Column(Integer, ForeignKey("financial_plans.id"), primary_key=True)
+
+    goal_amount = Column(Float, nullable=True)
+    months_p10 = Column(Integer, nullable=True)
+    months_p50 = Column(Integer, nullable=True)
+    months_p90 = Column(Integer, nullable=True)
+    probability = Column(Float, nullable=True)
+    projection_json = Column(Text, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    plan = relationship("FinancialPlan", back_populates="goal_projection")
+
+
+class PlanHealth(Base):
+    __tablename__ = "plan_health"
+    plan_id = Column(Integer, ForeignKey("financial_plans.id"), primary_key=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
+
+    savings_rate = Column(Float, nullable=False)
+    emergency_months = Column(Float, nullable=False)
+    spending_pct = Column(Float, nullable=False)
+
+    high_spending = Column(Boolean, nullable=False, index=True)
+    deficit = Column(Boolean, nullable=False, index=True)
+    low_emergency_fund = Column(Boolean, nullable=False, index=True)
+    excellent_savings = Column(Boolean, nullable=False)
+    alert_count = Column(Integer, nullable=False, index=True)
+
+    score = Column(Integer, nullable=False, index=True)
+    rating = Column(String, nullable=False)
+
+    evaluated_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class JobCheckpoint(Base):
+    __tablename__ = "job_checkpoints"
+    job = Column(String, primary_key=True)
+    last_plan_id = Column(Integer, nullable=False, default=0)
+    last_run_at = Column(DateTime, nullable=True)
+
+
+class PriceBar(Base):
+    __tablename__ = "price_bars"
+    # Composite primary key doubles as the (symbol, date) range-scan index
+    symbol = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(BigInteger, nullable=True)
+
+
+class PlanDraft(Base):
+    __tablename__ = "plan_drafts"
+    id = Column(String, primary_key=True)
+    payload = Column(Text, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
 
 
 
@@ -85,3 +156,44 @@ def create_database():
     """Creates all database tables."""
     Base.metadata.create_all(bind=engine)
 
+
+PRICE_BAR_COLUMNS = ["symbol", "date", "open", "high", "low", "close", "volume"]
+
+
+def ingest_price_bars(df, symbol: str) -> int:
+    """
+    Bulk loads an OHLCV DataFrame (Date, Open, High, Low, Close, Volume) into price_bars.
+    PostgreSQL uses COPY through a staging table; other databases use executemany.
+    Existing bars for the same (symbol, date) are replaced. Returns the number of bars.
+    """
+    bars = df.rename(columns=str.lower).assign(symbol=symbol.upper())
+    bars["date"] = bars["date"].astype("datetime64[ns]").dt.date
+    bars = bars.drop_duplicates(["symbol", "date"], keep="last")[PRICE_BAR_COLUMNS]
+    if bars.empty:
+        return 0
+
+    if engine.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        bars.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        columns = ", ".join(PRICE_BAR_COLUMNS)
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in PRICE_BAR_COLUMNS[2:])
+        raw = engine.raw_connection()
+        try:
+            with raw.cursor() as cursor:
+                cursor.execute("CREATE TEMP TABLE price_bars_staging (LIKE price_bars) ON COMMIT DROP")
+                cursor.copy_expert(f"COPY price_bars_staging ({columns}) FROM STDIN WITH CSV", buffer)
+                cursor.execute(
+                    f"INSERT INTO price_bars ({columns}) SELECT {columns} FROM price_bars_staging "
+                    f"ON CONFLICT (symbol, date) DO UPDATE SET {updates}"
+                )
+            raw.commit()
+        finally:
+            raw.close()
+    else:
+        # tolist() hands the driver plain Python values instead of NumPy scalars
+        rows = [dict(zip(PRICE_BAR_COLUMNS, values)) for values in zip(*(bars[c].tolist() for c in PRICE_BAR_COLUMNS))]
+        with engine.begin() as conn:
+            conn.execute(insert(PriceBar.__table__).prefix_with("OR REPLACE"), rows)
+    return len(bars)
+
@@ -0,0 +1,104 @@
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from backend.database import SessionLocal, PlanDraft
+
+
+DRAFT_TTL_SECONDS = int(os.getenv("PLAN_DRAFT_TTL_SECONDS", "3600"))
+MAX_DRAFTS = int(os.getenv("PLAN_DRAFT_MAX_ENTRIES", "10000"))
+
+
+def new_draft_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+class InMemoryDraftStore:
+    """
+    Generated plans waiting to be saved, held in this process.
+    Entries expire after `ttl` seconds and the oldest are dropped beyond `max_entries`.
+    """
+
+    def __init__(self, ttl: int = DRAFT_TTL_SECONDS, max_entries: int = MAX_DRAFTS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._drafts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, draft: dict) -> str:
+        draft_id = new_draft_id()
+        now = time.monotonic()
+        with self._lock:
+            self._drafts[draft_id] = (now + self.ttl, draft)
+            # Insertion order == expiry order, so expired drafts are always at the front.
+            while self._drafts:
+                oldest_id, (expires_at, _) = next(iter(self._drafts.items()))
+                if expires_at > now and len(self._drafts) <= self.max_entries:
+                    break
+                del self._drafts[oldest_id]
+        return draft_id
+
+    def take(self, draft_id: str):
+        """Removes and returns a draft, or None if it is unknown or expired."""
+        with self._lock:
+            entry = self._drafts.pop(draft_id, None)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+
+class DatabaseDraftStore:
+    """
+    Drafts kept in the plan_drafts table, so any worker can save a draft another worker made.
+    Expired drafts are purged on put, and the soonest-expiring go first beyond `max_entries`.
+    """
+
+    def __init__(self, ttl: int = DRAFT_TTL_SECONDS, max_entries: int = MAX_DRAFTS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def put(self, draft: dict) -> str:
+        draft_id = new_draft_id()
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            db.query(PlanDraft).filter(PlanDraft.expires_at <= now).delete(synchronize_session=False)
+            excess = db.query(PlanDraft).count() - self.max_entries + 1
+            if excess > 0:
+                oldest = db.query(PlanDraft.id).order_by(PlanDraft.expires_at).limit(excess)
+                db.query(PlanDraft).filter(PlanDraft.id.in_(oldest.scalar_subquery())).delete(synchronize_session=False)
+            db.add(PlanDraft(id=draft_id, payload=json.dumps(draft), expires_at=now + timedelta(seconds=self.ttl)))
+            db.commit()
+        finally:
+            db.close()
+        return draft_id
+
+    def take(self, draft_id: str):
+        db = SessionLocal()
+        try:
+            row = db.query(PlanDraft.payload, PlanDraft.expires_at).filter(PlanDraft.id == draft_id).first()
+            if row is None:
+                return None
+            # Only the caller whose DELETE removed the row gets the draft, so it is saved once
+            deleted = db.query(PlanDraft).filter(PlanDraft.id == draft_id).delete(synchronize_session=False)
+            db.commit()
+            if deleted != 1 or row.expires_at <= datetime.utcnow():
+                return None
+            return json.loads(row.payload)
+        finally:
+            db.close()
+
+
+def get_draft_store():
+    """
+    Drafts are shared through the database by default, because a draft made by one
+    gunicorn worker is usually saved through another. PLAN_DRAFT_STORE=memory keeps
+    them in this process, which is only safe with a single worker.
+    """
+    if os.getenv("PLAN_DRAFT_STORE", "db").lower() == "memory":
+        return InMemoryDraftStore()
+    return DatabaseDraftStore()
@@ -0,0 +1,127 @@
+# backend/health.py
+# Financial health rules: alerts ("watchdog") and the 0-100 health score.
+# The scalar functions serve single requests, the *_batch version scores whole DataFrames.
+
+import numpy as np
+import pandas as pd
+
+
+HIGH_SPENDING_RATIO = 0.8       # Rule 1: expenses above 80% of income
+LOW_EMERGENCY_MONTHS = 3        # Rule 3: savings cover fewer months of expenses than this
+EXCELLENT_SAVINGS_RATE = 30     # Rule 4: monthly savings rate (%) above this
+
+
+def check_financial_health_triggers(income: float, expenses: float, total_savings: float):
+    """
+    Acts as an autonomous agent that monitors financial health.
+    """
+    alerts = []
+    
+    # Calculate Monthly Savings (Cash Flow)
+    monthly_savings = income - expenses
+    savings_rate = (monthly_savings / income) * 100 if income > 0 else 0
+
+    # Calculate Emergency Fund Coverage (Months of expenses covered)
+    emergency_months = total_savings / expenses if expenses > 0 else 0
+    
+    # --- RULE 1: HIGH SPENDING (Habit Alert) ---
+    if income > 0 and expenses > (income * HIGH_SPENDING_RATIO):
+        alerts.append({
+            "type": "danger",
+            "icon": "⚠️",
+            "message": f"Critical: You are spending {int((expenses/income)*100)}% of your income. Immediate budgeting required."
+        })
+    
+    # --- RULE 2: DEFICIT (Habit Alert) ---
+    if expenses > income:
+        alerts.append({
+            "type": "danger",
+            "icon": "🚨",
+            "message": "Deficit Alert: You are spending more than you earn. You are burning through cash."
+        })
+
+    # --- RULE 3: LOW EMERGENCY FUND (Safety Alert) ---
+    # If you have less than 3 months of expenses saved up
+    if emergency_months < LOW_EMERGENCY_MONTHS:
+        alerts.append({
+            "type": "warning",
+            "icon": "📉",
+            "message": f"Risk Detected: Your emergency fund only covers {emergency_months:.1f} months of expenses. Aim for 6 months."
+        })
+
+    # --- RULE 4: EXCELLENT HABITS (Habit Alert) ---
+    # Real Monthly Savings Rate > 30%
+    if savings_rate > EXCELLENT_SAVINGS_RATE:
+        alerts.append({
+            "type": "success",
+            "icon": "🌟",
+            "message": f"Excellent: You are saving {int(savings_rate)}% of your monthly income. You are on track for wealth building."
+        })
+
+    return alerts
+
+
+def calculate_health_score(income: float, expenses: float, savings: float):
+    """Scores financial health out of 100 from the savings rate and emergency buffer."""
+    # 1. Calculate Metrics
+    savings_rate = 0
+    if income > 0:
+        savings_rate = ((income - expenses) / income) * 100
+    
+    savings_buffer = 0
+    if expenses > 0:
+        savings_buffer = savings / expenses
+        
+    # 2. Scoring Logic
+    score = 0
+    score += max(0, min(60, savings_rate * 1.2)) # Max 60 pts from rate
+    score += max(0, min(40, (savings_buffer / 6) * 40)) # Max 40 pts from buffer
+    
+    score = int(score)
+    
+    # 3. Rating
+    rating = "Needs Improvement"
+    feedback = "Focus on increasing your monthly savings."
+    if score > 80:
+        rating = "Excellent"
+        feedback = "You have outstanding financial discipline!"
+    elif score > 60:
+        rating = "Good"
+        feedback = "You are on the right track. Keep it up!"
+        
+    return {"score": score, "rating": rating, "feedback": feedback}
+
+
+def evaluate_health_batch(plans: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applies the same alert rules and health score as the functions above to a whole
+    DataFrame of plans (columns: income, expenses, savings) with array operations.
+    Returns one row per plan with the metrics, a flag per alert rule and the score.
+    """
+    income = plans["income"].to_numpy(dtype=float)
+    expenses = plans["expenses"].to_numpy(dtype=float)
+    savings = plans["savings"].to_numpy(dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        savings_rate = np.where(income > 0, (income - expenses) / income * 100, 0.0)
+        emergency_months = np.where(expenses > 0, savings / expenses, 0.0)
+        spending_pct = np.where(income > 0, expenses / income * 100, 0.0)
+
+    score = (
+        np.clip(savings_rate * 1.2, 0, 60)
+        + np.clip(emergency_months / 6 * 40, 0, 40)
+    ).astype(int)
+
+    result = pd.DataFrame({
+        "savings_rate": savings_rate,
+        "emergency_months": emergency_months,
+        "spending_pct": spending_pct,
+        "high_spending": (income > 0) & (expenses > income * HIGH_SPENDING_RATIO),
+        "deficit": expenses > income,
+        "low_emergency_fund": emergency_months < LOW_EMERGENCY_MONTHS,
+        "excellent_savings": savings_rate > EXCELLENT_SAVINGS_RATE,
+        "score": score,
+        "rating": np.select([score > 80, score > 60], ["Excellent", "Good"], "Needs Improvement"),
+    }, index=plans.index)
+    result["alert_count"] = result[["high_spending", "deficit", "low_emergency_fund"]].sum(axis=1)
+    return result
@@ -0,0 +1,172 @@
+# backend/jobs.py
+# Batch jobs over saved plans. Run with: python -m backend.jobs <job>
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import select, delete, insert
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.database import (
+    SessionLocal, create_database, ingest_price_bars, FinancialPlan, GoalProjection, PlanHealth, JobCheckpoint
+)
+from backend.health import evaluate_health_batch
+from ml.goal_projection import project_goals_batch
+
+
+def _iter_plan_chunks(db, query, chunk_size: int):
+    """Keyset pagination over FinancialPlan ids, so memory stays flat however many rows exist."""
+    last_id = 0
+    while True:
+        chunk = (
+            query.filter(FinancialPlan.id > last_id)
+            .order_by(FinancialPlan.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not chunk:
+            return
+        last_id = chunk[-1].id
+        yield chunk
+
+
+def reproject_saved_plans(db, chunk_size: int = 500) -> int:
+    """Re-runs the Monte Carlo goal projection for every saved plan. Returns the number of plans."""
+    total = 0
+    for plans in _iter_plan_chunks(db, db.query(FinancialPlan), chunk_size):
+        existing = {
+            p.plan_id: p
+            for p in db.query(GoalProjection).filter(GoalProjection.plan_id.in_([plan.id for plan in plans]))
+        }
+        portfolios = []
+        for plan in plans:
+            try:
+                portfolios.append(json.loads(plan.portfolio_json or "{}"))
+            except ValueError:
+                portfolios.append({})
+        goal_amounts = [existing[p.id].goal_amount if p.id in existing else None for p in plans]
+
+        results = project_goals_batch(
+            [p.savings for p in plans],
+            [p.income - p.expenses for p in plans],
+            portfolios,
+            goal_amounts,
+        )
+
+        for plan, result in zip(plans, results):
+            row = existing.get(plan.id) or GoalProjection(plan_id=plan.id)
+            months = result["months_to_goal"] or {}
+            row.goal_amount = result["goal_amount"]
+            row.months_p10 = months.get("p10")
+            row.months_p50 = months.get("p50")
+            row.months_p90 = months.get("p90")
+            row.probability = result["probability_of_reaching_goal"]
+            row.projection_json = json.dumps(result)
+            db.add(row)
+        db.commit()
+        db.expunge_all()
+        total += len(plans)
+    return total
+
+
+def run_health_watchdog(db, chunk_size: int = 50_000, full: bool = False) -> int:
+    """
+    Evaluates the alert rules and health score for saved plans into plan_health.
+    Only plans saved since the last run are processed, unless full=True.
+    Plans are never edited after saving, so the last processed id is the checkpoint.
+    Returns the number of plans evaluated.
+    """
+    checkpoint = db.get(JobCheckpoint, "watchdog") or JobCheckpoint(job="watchdog", last_plan_id=0)
+    last_id = 0 if full else checkpoint.last_plan_id
+    columns = [c.name for c in PlanHealth.__table__.columns]
+    total = 0
+
+    while True:
+        chunk = pd.read_sql(
+            select(
+                FinancialPlan.id.label("plan_id"),
+                FinancialPlan.owner_id,
+                FinancialPlan.income,
+                FinancialPlan.expenses,
+                FinancialPlan.savings,
+            )
+            .where(FinancialPlan.id > last_id)
+            .order_by(FinancialPlan.id)
+            .limit(chunk_size),
+            db.connection(),
+        )
+        if chunk.empty:
+            break
+
+        results = evaluate_health_batch(chunk)
+        results["plan_id"] = chunk["plan_id"]
+        results["owner_id"] = chunk["owner_id"].astype(object).where(chunk["owner_id"].notna(), None)
+        results["evaluated_at"] = datetime.utcnow()
+        # tolist() hands the driver plain Python values instead of NumPy scalars
+        rows = [dict(zip(columns, values)) for values in zip(*(results[c].tolist() for c in columns))]
+
+        first_id, last_id = int(chunk["plan_id"].iloc[0]), int(chunk["plan_id"].iloc[-1])
+        db.execute(delete(PlanHealth).where(PlanHealth.plan_id.between(first_id, last_id)))
+        db.connection().execute(insert(PlanHealth.__table__), rows)
+        checkpoint.last_plan_id = last_id
+        checkpoint.last_run_at = datetime.utcnow()
+        db.merge(checkpoint)
+        db.commit()
+        total += len(chunk)
+
+    return total
+
+
+def ingest_prices(db, path: str, symbol: str, chunk_size: int = 100_000) -> int:
+    """Loads an OHLCV CSV in the data/ format into price_bars. Returns the number of bars."""
+    total = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        total += ingest_price_bars(chunk, symbol)
+    return total
+
+
+JOBS = {
+    "reproject": reproject_saved_plans,
+    "watchdog": run_health_watchdog,
+    "ingest-prices": ingest_prices,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IntellectMoney batch jobs")
+    subparsers = parser.add_subparsers(dest="job", required=True)
+
+    reproject = subparsers.add_parser("reproject", help="Re-run goal projections for all saved plans")
+    reproject.add_argument("--chunk-size", type=int, default=500)
+
+    watchdog = subparsers.add_parser("watchdog", help="Evaluate health alerts and scores for new plans")
+    watchdog.add_argument("--chunk-size", type=int, default=50_000)
+    watchdog.add_argument("--full", action="store_true", help="Re-evaluate every plan, not just new ones")
+
+    ingest = subparsers.add_parser("ingest-prices", help="Bulk load an OHLCV CSV into the price table")
+    ingest.add_argument("path")
+    ingest.add_argument("--symbol", required=True)
+    ingest.add_argument("--chunk-size", type=int, default=100_000)
+
+    args = vars(parser.parse_args())
+    job = args.pop("job")
+
+    create_database()
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        count = JOBS[job](db, **args)
+        print(f"{job}: processed {count} rows in {time.perf_counter() - start:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
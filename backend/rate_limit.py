@@ -0,0 +1,228 @@
+import asyncio
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+
+# --- Budgets per endpoint class: (tokens per second, bucket capacity) ---
+ENDPOINT_CLASSES = {
+    "llm": (float(os.getenv("RATE_LLM_PER_MIN", "6")) / 60, int(os.getenv("RATE_LLM_BURST", "3"))),
+    "market": (float(os.getenv("RATE_MARKET_PER_MIN", "30")) / 60, int(os.getenv("RATE_MARKET_BURST", "10"))),
+    "auth": (float(os.getenv("RATE_AUTH_PER_MIN", "10")) / 60, int(os.getenv("RATE_AUTH_BURST", "5"))),
+    "read": (float(os.getenv("RATE_READ_PER_MIN", "120")) / 60, int(os.getenv("RATE_READ_BURST", "30"))),
+}
+
+# Path prefix -> endpoint class. First match wins, anything else under /api is "read".
+ROUTE_CLASSES = [
+    ("/api/recommendations", "llm"),
+    ("/api/chatbot", "llm"),
+    ("/api/market-news", "market"),
+    ("/api/prices", "market"),
+    ("/api/login", "auth"),
+    ("/api/register", "auth"),
+]
+
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "32"))
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", "64"))
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("QUEUE_TIMEOUT_SECONDS", "2"))
+
+# X-Forwarded-For is only honoured when the direct peer is one of these proxies
+TRUSTED_PROXIES = {ip.strip() for ip in os.getenv("TRUSTED_PROXIES", "").split(",") if ip.strip()}
+
+
+def classify_path(path: str) -> Optional[str]:
+    """Returns the endpoint class for a request path, or None if it is not rate limited."""
+    if not path.startswith("/api/"):
+        return None
+    for prefix, endpoint_class in ROUTE_CLASSES:
+        if path.startswith(prefix):
+            return endpoint_class
+    return "read"
+
+
+class InMemoryBucketStore:
+    """Token buckets held in this process. Idle buckets are evicted LRU-first."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, capacity: int, cost: float = 1.0) -> Tuple[bool, float]:
+        """Consumes `cost` tokens. Returns (allowed, seconds until enough tokens refill)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(capacity), now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        retry_after = 0.0 if allowed else (cost - tokens) / rate
+        return allowed, retry_after
+
+
+class SQLiteBucketStore:
+    """Token buckets in a SQLite file, so every worker on a host shares one budget."""
+
+    # take() can wait on other workers' locks, so callers must keep it off the event loop
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._last_purge = 0.0
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_buckets_full_at ON rate_buckets (full_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, rate: float, capacity: int, cost: float = 1.0) -> Tuple[bool, float]:
+        # Wall clock, because monotonic clocks are not comparable across processes.
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (float(capacity), now)
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            # Once a bucket has refilled it is the same as no row, so it can be purged
+            full_at = now + (capacity - tokens) / rate
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)",
+                (key, tokens, now, full_at),
+            )
+            if now - self._last_purge > 60:
+                self._last_purge = now
+                conn.execute("DELETE FROM rate_buckets WHERE full_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        retry_after = 0.0 if allowed else (cost - tokens) / rate
+        return allowed, retry_after
+
+
+def get_bucket_store():
+    """Uses the shared SQLite store when RATE_LIMIT_DB is set, otherwise in-memory buckets."""
+    path = os.getenv("RATE_LIMIT_DB")
+    if path:
+        return SQLiteBucketStore(path)
+    return InMemoryBucketStore()
+
+
+def client_ip(request) -> str:
+    """
+    The client's IP address. X-Forwarded-For is client-controlled, so it is only used when
+    the request comes from a proxy in TRUSTED_PROXIES, taking the closest untrusted hop.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if peer not in TRUSTED_PROXIES:
+        return peer
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if hop not in TRUSTED_PROXIES:
+            return hop
+    return peer
+
+
+def client_identity(request) -> str:
+    """Keys a request by the JWT subject when a valid token is sent, otherwise by client IP."""
+    auth_header = request.headers.get("authorization", "")
+    if auth_header.lower().startswith("bearer "):
+        # Imported lazily so this module does not pull in the DB layer at import time.
+        from backend.auth import SECRET_KEY, ALGORITHM
+        try:
+            payload = jwt.decode(auth_header[7:], SECRET_KEY, algorithms=[ALGORITHM])
+            if payload.get("sub"):
+                return f"user:{payload['sub']}"
+        except JWTError:
+            pass
+    return f"ip:{client_ip(request)}"
+
+
+def _reject(status_code: int, detail: str, retry_after: float):
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionControlMiddleware(BaseHTTPMiddleware):
+    """
+    Rejects abusive clients early and caps how many API requests run at once.
+    Over-budget clients get 429, and a full server gets 503, both with Retry-After.
+    """
+
+    def __init__(self, app, store=None, max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+                 max_queued: int = MAX_QUEUED_REQUESTS, queue_timeout: float = QUEUE_TIMEOUT_SECONDS):
+        super().__init__(app)
+        self.store = store if store is not None else get_bucket_store()
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._queued = 0
+
+    async def dispatch(self, request, call_next):
+        endpoint_class = classify_path(request.url.path)
+        if endpoint_class is None or request.method == "OPTIONS":
+            return await call_next(request)
+
+        # 1. Per-client token bucket for this endpoint class
+        rate, capacity = ENDPOINT_CLASSES[endpoint_class]
+        key = f"{endpoint_class}:{client_identity(request)}"
+        if self.store.blocking:
+            allowed, retry_after = await run_in_threadpool(self.store.take, key, rate, capacity)
+        else:
+            allowed, retry_after = self.store.take(key, rate, capacity)
+        if not allowed:
+            return _reject(429, "Too many requests. Please slow down.", retry_after)
+
+        # 2. Global concurrency cap with a short, bounded wait queue
+        if self._slots.locked():
+            if self._queued >= self.max_queued:
+                return _reject(503, "Server is busy. Please try again shortly.", self.queue_timeout)
+            self._queued += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                return _reject(503, "Server is busy. Please try again shortly.", self.queue_timeout)
+            finally:
+                self._queued -= 1
+        else:
+            await self._slots.acquire()
+
+        try:
+            return await call_next(request)
+        finally:
+            self._slots.release()
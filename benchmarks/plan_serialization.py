@@ -0,0 +1,117 @@
+# benchmarks/plan_serialization.py
+# /api/plans/me end to end for users with 10, 100 and 1000 saved plans: request time
+# against a seeded database, and bytes on the wire raw, gzip and brotli.
+# Run from the project root: python benchmarks/plan_serialization.py
+
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+# Keep the benchmark away from the real database and rate limits
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["RATE_READ_BURST"] = "1000000"
+os.environ["RATE_READ_PER_MIN"] = "1000000"
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from backend.app import app, PlanResponse
+from backend.auth import create_access_token, get_current_user
+from backend.compression import brotli
+from backend.database import SessionLocal, get_db, User, FinancialPlan
+
+
+SUMMARY = (
+    "Your monthly surplus gives you a strong base for wealth building. Prioritise a six-month "
+    "emergency fund in liquid funds, then direct the remaining surplus into diversified equity SIPs. "
+) * 8
+RECOMMENDATIONS = [
+    f"{i}. **Step {i}:** Allocate a fixed share of your surplus to a low-cost Nifty 50 index fund via SIP "
+    "and review the allocation every six months." for i in range(1, 5)
+]
+PORTFOLIO = {"labels": ["Equity Index Funds", "Debt Funds", "Gold", "Liquid Funds"], "data": [50, 30, 10, 10]}
+
+
+@app.get("/bench/plans/me-baseline", response_model=List[PlanResponse])
+def baseline_get_user_plans(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """The handler as it was before: full ORM objects, validated into PlanResponse."""
+    return db.query(FinancialPlan).filter(FinancialPlan.owner_id == current_user.id).order_by(FinancialPlan.created_at.desc()).all()
+
+
+def seed_user(n: int) -> str:
+    """Creates a user with n saved plans and returns a bearer token for them."""
+    email = f"bench{n}@example.com"
+    now = datetime(2026, 1, 1)
+    db = SessionLocal()
+    try:
+        user = User(fullname="Bench", email=email, hashed_password="-")
+        db.add(user)
+        db.flush()
+        db.add_all([
+            FinancialPlan(
+                owner_id=user.id,
+                created_at=now - timedelta(days=i),
+                income=85000.0 + i,
+                expenses=52000.0,
+                savings=250000.0,
+                risk_tolerance="medium",
+                ai_summary=SUMMARY,
+                recommendations_json=json.dumps(RECOMMENDATIONS),
+                portfolio_json=json.dumps(PORTFOLIO),
+            )
+            for i in range(n)
+        ])
+        db.commit()
+    finally:
+        db.close()
+    return create_access_token(data={"sub": email})
+
+
+def best_ms(client, path: str, headers: dict, runs: int) -> float:
+    """Best average over 5 rounds, in milliseconds per request."""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(runs):
+            client.get(path, headers=headers)
+        best = min(best, (time.perf_counter() - start) / runs * 1000)
+    return best
+
+
+def main():
+    client = TestClient(app)
+    print(f"{'plans':>6} {'before ms':>10} {'after ms':>9} {'speedup':>8} {'raw KB':>8} {'gzip KB':>8} {'br KB':>7}")
+    for n in (10, 100, 1000):
+        auth = {"Authorization": f"Bearer {seed_user(n)}"}
+        identity = {**auth, "Accept-Encoding": "identity"}
+        before = client.get("/bench/plans/me-baseline", headers=identity)
+        after = client.get("/api/plans/me", headers=identity)
+        assert before.json() == after.json()
+
+        runs = max(3, 500 // n)
+        t_before = best_ms(client, "/bench/plans/me-baseline", identity, runs)
+        t_after = best_ms(client, "/api/plans/me", identity, runs)
+
+        gzipped = client.get("/api/plans/me", headers={**auth, "Accept-Encoding": "gzip"})
+        raw_gzip = int(gzipped.headers["content-length"])
+        if brotli:
+            brotlied = client.get("/api/plans/me", headers={**auth, "Accept-Encoding": "br"})
+            br_size = f"{int(brotlied.headers['content-length']) / 1024:7.1f}"
+        else:
+            br_size = "    n/a"
+        print(
+            f"{n:>6} {t_before:>10.2f} {t_after:>9.2f} {t_before / t_after:>7.1f}x "
+            f"{len(after.content) / 1024:>8.1f} {raw_gzip / 1024:>8.1f} {br_size}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,10 @@ document.addEventListener('DOMContentLoaded', () => {
     const chatInput = document.getElementById('chat-input');
     const chatBody = document.getElementById('chat-body');
 
+    // One conversation per browser tab, so follow-up questions keep their context.
+    // The server issues the session id with its first reply.
+    let chatSessionId = sessionStorage.getItem('chatSessionId');
+
     
     chatBubble.addEventListener('click', () => {
         chatWindow.classList.toggle('hidden-chat');
@@ -28,12 +32,14 @@ document.addEventListener('DOMContentLoaded', () => {
 
         try {
             
+            const headers = { 'Content-Type': 'application/json' };
+            const token = localStorage.getItem('userToken');
+            if (token) headers['Authorization'] = `Bearer ${token}`;
+
             const response = await fetch('http://127.0.0.1:8000/api/chatbot', {
                 method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ message: messageText }),
+                headers: headers,
+                body: JSON.stringify({ message: messageText, session_id: chatSessionId }),
             });
 
             if (!response.ok) {
@@ -41,6 +47,10 @@ document.addEventListener('DOMContentLoaded', () => {
             }
 
             const data = await response.json();
+            if (data.session_id) {
+                chatSessionId = data.session_id;
+                sessionStorage.setItem('chatSessionId', chatSessionId);
+            }
             
             
             addMessageToChat(data.reply, 'bot');
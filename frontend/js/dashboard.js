@@ -90,7 +90,7 @@ document.addEventListener('DOMContentLoaded', () => {
             displayHealthScore(scoreData);
 
             // --- C. Save Plan to Database ---
-            await savePlan(userProfile, planData);
+            await savePlan(planData.draft_id);
 
         } catch (error) {
             console.error('An error occurred:', error);
@@ -201,22 +201,34 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // --- Helper Function: Save Plan to DB ---
-    async function savePlan(profileData, planData) {
-        if (!token) return;
+    // The server keeps the generated plan as a draft, so only its id is sent back.
+    async function savePlan(draftId) {
+        if (!token || !draftId) return;
         try {
-            await fetch('http://127.0.0.1:8000/api/plans', {
+            const response = await fetch('http://127.0.0.1:8000/api/plans', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                     'Authorization': `Bearer ${token}`
                 },
-                body: JSON.stringify({
-                    profile_data: profileData,
-                    plan_data: planData
-                })
+                body: JSON.stringify({ draft_id: draftId })
             });
+            if (!response.ok) {
+                const errorData = await response.json().catch(() => ({}));
+                throw new Error(errorData.detail || 'Failed to save plan');
+            }
         } catch (error) {
             console.error('Error saving plan:', error);
+            showSaveError(`Your plan was not saved: ${error.message}`);
         }
     }
+
+    // --- Helper Function: Show a failed save without hiding the plan ---
+    function showSaveError(message) {
+        const container = alertsContainer || recommendationOutput;
+        const div = document.createElement('div');
+        div.style.cssText = 'background: rgba(220, 53, 69, 0.2); border: 1px solid #dc3545; color: #ff6b6b; padding: 15px; border-radius: 12px; margin-bottom: 10px;';
+        div.textContent = message;
+        container.appendChild(div);
+    }
 });
\ No newline at end of file
@@ -0,0 +1,209 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from ml.goal_projection import ASSET_CLASSES, ASSUMPTIONS, DEFAULT_ASSET_CLASS, classify_label
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+# Price series per asset class, in the data/ OHLCV format (Date,Open,High,Low,Close,Volume).
+# Any data/<asset_class>.csv is picked up as well, e.g. data/gold.csv.
+PRICE_FILES = {
+    "equity": "historical_prices.csv",
+}
+
+ASSET_CLASS_NAMES = [name for name, _, _ in ASSET_CLASSES] + [DEFAULT_ASSET_CLASS]
+
+REBALANCE_FREQUENCIES = {
+    "none": None,
+    "monthly": "M",
+    "quarterly": "Q",
+    "yearly": "Y",
+}
+
+MAX_CURVE_POINTS = 250
+
+# CAGR and annualized volatility over shorter spans are mostly noise, so they are not reported
+MIN_ANNUALIZED_YEARS = 1.0
+
+
+@lru_cache(maxsize=1)
+def load_price_store(data_dir: str = DATA_DIR) -> pd.DataFrame:
+    """
+    Loads closing prices for every asset class that has a price file.
+    Returns a Date-indexed frame with one column per asset class, forward-filled on gaps.
+    """
+    files = dict(PRICE_FILES)
+    for name in ASSET_CLASS_NAMES:
+        candidate = f"{name}.csv"
+        if os.path.exists(os.path.join(data_dir, candidate)):
+            files[name] = candidate
+
+    closes = {}
+    for name, filename in files.items():
+        path = os.path.join(data_dir, filename)
+        if not os.path.exists(path):
+            continue
+        df = pd.read_csv(path, usecols=['Date', 'Close'], parse_dates=['Date'])
+        closes[name] = df.drop_duplicates('Date').set_index('Date')['Close'].sort_index()
+
+    if not closes:
+        raise FileNotFoundError(f"No price files found in {data_dir}")
+    return pd.DataFrame(closes).sort_index().ffill().dropna()
+
+
+def asset_returns(prices: pd.DataFrame):
+    """
+    Per-period simple returns for every asset class, shape (periods, asset classes).
+    Classes without a price series accrue at their assumed annual return instead,
+    and are reported back as proxied.
+    """
+    dates = prices.index
+    observed = prices.pct_change().iloc[1:]
+    elapsed_years = np.diff(dates.values).astype('timedelta64[D]').astype(float) / 365.25
+
+    returns = np.empty((len(observed), len(ASSET_CLASS_NAMES)))
+    proxied = []
+    for j, name in enumerate(ASSET_CLASS_NAMES):
+        if name in observed:
+            returns[:, j] = observed[name].to_numpy()
+        else:
+            returns[:, j] = (1 + ASSUMPTIONS[name][0]) ** elapsed_years - 1
+            proxied.append(name)
+    return dates[1:], returns, proxied
+
+
+def parse_allocation(portfolio) -> dict:
+    """
+    Validates a labels/data allocation, given as a dict or a JSON string.
+    Raises ValueError unless it has matching labels and non-negative weights with a positive total.
+    """
+    if isinstance(portfolio, (str, bytes)):
+        try:
+            portfolio = json.loads(portfolio)
+        except ValueError:
+            raise ValueError("allocation is not valid JSON")
+    if not isinstance(portfolio, dict):
+        raise ValueError("allocation must be an object with labels and data")
+    labels = portfolio.get("labels") or []
+    data = portfolio.get("data") or []
+    if not isinstance(labels, list) or not isinstance(data, list) or len(labels) != len(data):
+        raise ValueError("labels and data must be lists of the same length")
+    try:
+        weights = [float(value) for value in data]
+    except (TypeError, ValueError):
+        raise ValueError("data must contain only numbers")
+    if not all(np.isfinite(w) and w >= 0 for w in weights) or sum(weights) <= 0:
+        raise ValueError("weights must be non-negative with a positive total")
+    return {"labels": labels, "data": weights}
+
+
+def allocation_weights(portfolios) -> np.ndarray:
+    """Turns labels/data allocations into a weight matrix of shape (allocations, asset classes)."""
+    index = {name: j for j, name in enumerate(ASSET_CLASS_NAMES)}
+    weights = np.zeros((len(portfolios), len(ASSET_CLASS_NAMES)))
+    for i, portfolio in enumerate(portfolios):
+        labels = (portfolio or {}).get("labels") or []
+        data = (portfolio or {}).get("data") or []
+        for label, value in zip(labels, data):
+            weights[i, index[classify_label(label)]] += float(value)
+    totals = weights.sum(axis=1, keepdims=True)
+    return np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+
+
+def _rebalance_windows(dates: pd.DatetimeIndex, rebalance: str):
+    """Index ranges between rebalancing dates. Weights reset to target at the start of each range."""
+    freq = REBALANCE_FREQUENCIES[rebalance]
+    if len(dates) == 0:
+        return []
+    if freq is None:
+        return [(0, len(dates))]
+    codes = dates.to_period(freq).asi8
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(dates)]
+    return list(zip(starts, ends))
+
+
+def backtest_weights(weights: np.ndarray, returns: np.ndarray, dates: pd.DatetimeIndex, rebalance: str = "monthly",
+                     start_date=None) -> dict:
+    """
+    Backtests many allocations at once. weights is (N, A), returns is (T, A).
+    start_date is the base price date before the first return (defaults to dates[0]).
+    Within each rebalancing window the portfolio drifts with prices, so values are
+    level * (weights @ cumulative growth), one matrix product per window for all N.
+    """
+    n_allocations, n_periods = weights.shape[0], returns.shape[0]
+    values = np.empty((n_allocations, n_periods))
+    level = np.ones(n_allocations)
+    for start, end in _rebalance_windows(dates, rebalance):
+        growth = np.cumprod(1 + returns[start:end], axis=0)
+        values[:, start:end] = level[:, None] * (weights @ growth.T)
+        level = values[:, end - 1]
+
+    previous = np.hstack([np.ones((n_allocations, 1)), values[:, :-1]])
+    peaks = np.maximum.accumulate(np.hstack([np.ones((n_allocations, 1)), values]), axis=1)[:, 1:]
+    # All-zero allocations end up at 0 and divide by it; backtest_portfolios drops their metrics
+    with np.errstate(invalid='ignore', divide='ignore'):
+        period_returns = values / previous - 1
+        drawdowns = values / peaks - 1
+
+    start_date = dates[0] if start_date is None and n_periods else start_date
+    years = (dates[-1] - start_date).days / 365.25 if n_periods else 0
+    final = values[:, -1] if n_periods else np.ones(n_allocations)
+    if years >= MIN_ANNUALIZED_YEARS and n_periods > 1:
+        cagr = final ** (1 / years) - 1
+        volatility = period_returns.std(axis=1, ddof=1) * np.sqrt(n_periods / years)
+    else:
+        cagr = volatility = np.full(n_allocations, np.nan)
+
+    return {
+        "values": values,
+        "total_return": final - 1,
+        "cagr": cagr,
+        "volatility": volatility,
+        "max_drawdown": drawdowns.min(axis=1) if n_periods else np.zeros(n_allocations),
+    }
+
+
+def _metric(value):
+    return None if not np.isfinite(value) else round(float(value) * 100, 2)
+
+
+def backtest_portfolios(portfolios, rebalance: str = "monthly", include_curve: bool = False, prices: pd.DataFrame = None) -> list:
+    """Backtests labels/data allocations against the price store. Metrics are in percent."""
+    if rebalance not in REBALANCE_FREQUENCIES:
+        raise ValueError(f"rebalance must be one of {sorted(REBALANCE_FREQUENCIES)}")
+    prices = load_price_store() if prices is None else prices
+    dates, returns, proxied = asset_returns(prices)
+    weights = allocation_weights(portfolios)
+    start_date = prices.index[0] if len(prices) else None
+    result = backtest_weights(weights, returns, dates, rebalance, start_date)
+
+    used = weights > 0
+    # An allocation with no weights holds nothing; reporting it as a -100% loss would be made up
+    invested = used.any(axis=1)
+    summaries = []
+    for i in range(len(portfolios)):
+        metric = _metric if invested[i] else (lambda value: None)
+        summary = {
+            "start_date": start_date.date().isoformat() if len(dates) else None,
+            "end_date": dates[-1].date().isoformat() if len(dates) else None,
+            "rebalance": rebalance,
+            "total_return": metric(result["total_return"][i]),
+            "cagr": metric(result["cagr"][i]),
+            "volatility": metric(result["volatility"][i]),
+            "max_drawdown": metric(result["max_drawdown"][i]),
+            "proxied_asset_classes": [name for j, name in enumerate(ASSET_CLASS_NAMES) if used[i, j] and name in proxied],
+        }
+        if include_curve:
+            step = max(1, int(np.ceil(len(dates) / MAX_CURVE_POINTS)))
+            summary["curve"] = {
+                "dates": [d.date().isoformat() for d in dates[::step]],
+                "values": np.round(result["values"][i, ::step], 4).tolist(),
+            }
+        summaries.append(summary)
+    return summaries
@@ -0,0 +1,220 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+
+# Asset classes matched by keyword in portfolio labels, with annual (expected return, volatility).
+ASSET_CLASSES = [
+    ("liquid", ("liquid", "cash", "savings account", "emergency"), (0.060, 0.010)),
+    ("debt", ("fixed deposit", "fd", "ppf", "epf", "bond", "debt", "gilt"), (0.072, 0.040)),
+    ("gold", ("gold", "silver", "commodit"), (0.080, 0.150)),
+    ("real_estate", ("real estate", "reit", "property"), (0.090, 0.120)),
+    ("international", ("international", "global", "us ", "nasdaq"), (0.100, 0.170)),
+    ("small_mid_cap", ("small", "mid"), (0.140, 0.240)),
+    ("equity", ("equity", "stock", "index", "nifty", "sensex", "large", "elss", "mutual fund", "sip"), (0.120, 0.180)),
+]
+DEFAULT_ASSET_CLASS = "other"
+DEFAULT_ASSUMPTION = (0.080, 0.100)
+ASSUMPTIONS = {name: assumption for name, _, assumption in ASSET_CLASSES}
+ASSUMPTIONS[DEFAULT_ASSET_CLASS] = DEFAULT_ASSUMPTION
+
+# Average pairwise correlation between asset classes when combining volatilities.
+ASSET_CORRELATION = 0.3
+
+# Reference allocations used before the AI has proposed a portfolio.
+REFERENCE_PORTFOLIOS = {
+    "Conservative Investor": {"labels": ["Debt Funds", "Liquid Funds", "Equity Index Funds", "Gold"], "data": [50, 20, 20, 10]},
+    "Balanced Investor": {"labels": ["Equity Index Funds", "Debt Funds", "Gold", "Liquid Funds"], "data": [50, 30, 10, 10]},
+    "Growth-Oriented Investor": {"labels": ["Equity Index Funds", "Mid & Small Cap Funds", "Debt Funds", "Gold"], "data": [55, 20, 15, 10]},
+}
+
+HORIZON_MONTHS = 360
+DEFAULT_PATHS = 6_000
+# The prompt only needs rounded figures, so the pre-prompt reference projection runs on
+# fewer paths. Together the two projections per request stay well inside 50 ms.
+REFERENCE_PATHS = 2_000
+PERCENTILES = (10, 50, 90)
+BAND_YEARS = (1, 3, 5, 10, 20, 30)
+
+_UNIT_MULTIPLIERS = {
+    "k": 1e3, "thousand": 1e3,
+    "l": 1e5, "lac": 1e5, "lacs": 1e5, "lakh": 1e5, "lakhs": 1e5,
+    "cr": 1e7, "crore": 1e7, "crores": 1e7,
+    "m": 1e6, "million": 1e6,
+}
+_AMOUNT_PATTERN = re.compile(
+    r"(₹|\brs\.?|\binr)?\s*(\d[\d,]*(?:\.\d+)?)\s*(thousand|lakhs|lakh|lacs|lac|crores|crore|cr|million|k|l|m)?\b",
+    re.IGNORECASE,
+)
+_YEAR_PATTERN = re.compile(r"(19|20)\d\d|2100")
+
+
+def parse_goal_amount(goal_text: str):
+    """Extracts the largest rupee amount from a goal like 'Buy a car worth 8 lakh'."""
+    if not goal_text:
+        return None
+    amounts = []
+    for currency, number, unit in _AMOUNT_PATTERN.findall(goal_text):
+        # A bare 4-digit year ("by 2030") is a deadline, not an amount
+        if not currency and not unit and _YEAR_PATTERN.fullmatch(number):
+            continue
+        value = float(number.replace(",", ""))
+        value *= _UNIT_MULTIPLIERS.get(unit.lower(), 1) if unit else 1
+        amounts.append(value)
+    amounts = [a for a in amounts if a >= 1000]  # Ignore ages, counts etc.
+    return max(amounts) if amounts else None
+
+
+def classify_label(label) -> str:
+    """Maps a portfolio label like 'Nifty 50 Index Fund' to an asset class name."""
+    name = f" {str(label).lower()} "
+    for asset_class, keywords, _ in ASSET_CLASSES:
+        if any(keyword in name for keyword in keywords):
+            return asset_class
+    return DEFAULT_ASSET_CLASS
+
+
+def portfolio_assumptions(portfolio: dict):
+    """Returns the (annual expected return, annual volatility) of a labels/data allocation."""
+    labels = (portfolio or {}).get("labels") or []
+    weights = np.asarray((portfolio or {}).get("data") or [], dtype=float)
+    if not labels or len(labels) != len(weights) or weights.sum() <= 0:
+        return DEFAULT_ASSUMPTION
+    weights = weights / weights.sum()
+
+    assumptions = np.asarray([ASSUMPTIONS[classify_label(label)] for label in labels])
+    mus, sigmas = assumptions[:, 0], assumptions[:, 1]
+
+    corr = np.full((len(labels), len(labels)), ASSET_CORRELATION)
+    np.fill_diagonal(corr, 1.0)
+    cov = corr * np.outer(sigmas, sigmas)
+    return float(weights @ mus), float(np.sqrt(weights @ cov @ weights))
+
+
+def _simulate_wealth(initial, monthly_contribution, mu, sigma, cum_shocks):
+    """
+    Wealth paths for one or more plans sharing the same cumulative shocks.
+    Uses W_t = G_t * (W_0 + c * sum_{s<=t} 1/G_s), so no Python loop over months.
+    A negative contribution draws savings down; once a path runs out of money the
+    bracket stays negative, so clipping at zero keeps it at zero from then on.
+    Plan parameters broadcast against cum_shocks of shape (paths, months).
+    """
+    months = np.arange(1, cum_shocks.shape[-1] + 1, dtype=np.float32)
+    drift = (mu - 0.5 * sigma ** 2) / 12.0
+    # In-place updates keep this to two full-size temporaries.
+    log_growth = (sigma / np.float32(np.sqrt(12.0))) * cum_shocks
+    log_growth += drift * months
+    growth = np.exp(log_growth)
+    np.reciprocal(growth, out=log_growth)
+    np.cumsum(log_growth, axis=-1, out=log_growth)
+    log_growth *= monthly_contribution
+    log_growth += initial
+    growth *= log_growth
+    np.maximum(growth, 0, out=growth)
+    return growth
+
+
+def _summarize(wealth, goal_amount, initial):
+    """Percentile time-to-goal and wealth bands for wealth paths of shape (..., paths, months)."""
+    horizon = wealth.shape[-1]
+    band_idx = [y * 12 - 1 for y in BAND_YEARS if y * 12 <= horizon]
+    bands = np.percentile(wealth[..., band_idx], PERCENTILES, axis=-2)  # (pct, ..., years)
+
+    months_to_goal = None
+    probability = None
+    if goal_amount is not None:
+        goal_amount = np.asarray(goal_amount, dtype=np.float32)[..., None, None]
+        reached = wealth >= goal_amount
+        hit = reached.any(axis=-1)
+        # Paths that never reach the goal get horizon + 1, reported as "not within horizon".
+        first = np.where(hit, reached.argmax(axis=-1) + 1, horizon + 1)
+        already_there = np.asarray(initial)[..., None] >= goal_amount[..., 0]
+        first = np.where(already_there, 0, first)
+        months_to_goal = np.percentile(first, PERCENTILES, axis=-1, method="lower")  # (pct, ...)
+        months_to_goal = np.where(months_to_goal > horizon, np.nan, months_to_goal)
+        probability = (hit | already_there).mean(axis=-1)
+    return bands, months_to_goal, probability
+
+
+def _format(bands, months_to_goal, probability, goal_amount, mu, sigma, n_paths, monthly_contribution):
+    years = BAND_YEARS[:len(bands[0])]
+    result = {
+        "expected_annual_return": round(mu * 100, 2),
+        "annual_volatility": round(sigma * 100, 2),
+        "simulated_paths": n_paths,
+        "monthly_contribution": round(float(monthly_contribution), 2),
+        "goal_amount": goal_amount,
+        "wealth_bands": {
+            f"year_{y}": {f"p{p}": round(float(bands[i][j]), 2) for i, p in enumerate(PERCENTILES)}
+            for j, y in enumerate(years)
+        },
+        "months_to_goal": None,
+        "probability_of_reaching_goal": None,
+    }
+    if months_to_goal is not None:
+        result["months_to_goal"] = {
+            f"p{p}": (None if np.isnan(m) else int(m)) for p, m in zip(PERCENTILES, months_to_goal)
+        }
+        result["probability_of_reaching_goal"] = round(float(probability), 4)
+    return result
+
+
+@lru_cache(maxsize=4)
+def _cumulative_shocks(n_paths: int, horizon: int, seed):
+    """Cumulative standard normal shocks, drawn once per (paths, horizon, seed) and reused."""
+    rng = np.random.default_rng(seed)
+    shocks = np.cumsum(rng.standard_normal((n_paths, horizon), dtype=np.float32), axis=1)
+    shocks.flags.writeable = False
+    return shocks
+
+
+def project_goal(initial: float, monthly_contribution: float, portfolio: dict, goal_amount=None,
+                 n_paths: int = DEFAULT_PATHS, horizon_months: int = HORIZON_MONTHS, seed: int = 42) -> dict:
+    """
+    Monte Carlo projection of savings growth for one allocation. A negative
+    monthly_contribution (a deficit) is withdrawn from savings every month.
+    Deterministic for a given seed, so results can be cached and compared.
+    """
+    mu, sigma = portfolio_assumptions(portfolio)
+    cum_shocks = _cumulative_shocks(n_paths, horizon_months, seed)
+    wealth = _simulate_wealth(
+        np.float32(initial), np.float32(monthly_contribution),
+        np.float32(mu), np.float32(sigma), cum_shocks,
+    )
+    bands, months_to_goal, probability = _summarize(wealth, goal_amount, initial)
+    return _format(bands, months_to_goal, probability, goal_amount, mu, sigma, n_paths, monthly_contribution)
+
+
+def project_goals_batch(initial, monthly_contribution, portfolios, goal_amounts,
+                        n_paths: int = 2_000, horizon_months: int = HORIZON_MONTHS,
+                        chunk_size: int = 16, seed: int = 42) -> list:
+    """
+    Projects many plans at once. All plans share one set of random shocks
+    (common random numbers), and plans are broadcast in chunks to bound memory.
+    A goal amount of None skips the time-to-goal estimate for that plan.
+    """
+    initial = np.asarray(initial, dtype=np.float32)
+    contribution = np.asarray(monthly_contribution, dtype=np.float32)
+    assumptions = np.asarray([portfolio_assumptions(p) for p in portfolios], dtype=np.float32).reshape(-1, 2)
+    goals = np.asarray([np.nan if g is None else g for g in goal_amounts], dtype=np.float32)
+    cum_shocks = _cumulative_shocks(n_paths, horizon_months, seed)
+
+    results = []
+    for start in range(0, len(initial), chunk_size):
+        sl = slice(start, start + chunk_size)
+        col = (slice(None), None, None)
+        wealth = _simulate_wealth(
+            initial[sl][col], contribution[sl][col],
+            assumptions[sl, 0][col], assumptions[sl, 1][col], cum_shocks,
+        )
+        chunk_goals = np.where(np.isnan(goals[sl]), np.inf, goals[sl])
+        bands, months_to_goal, probability = _summarize(wealth, chunk_goals, initial[sl])
+        for k in range(wealth.shape[0]):
+            goal = None if np.isnan(goals[start + k]) else float(goals[start + k])
+            results.append(_format(
+                bands[:, k], months_to_goal[:, k] if goal is not None else None,
+                probability[k], goal, float(assumptions[start + k, 0]),
+                float(assumptions[start + k, 1]), n_paths, contribution[start + k],
+            ))
+    return results